@@ -8,8 +8,10 @@ Use this script to create your demonstration video.
 import os
 import sys
 import time
+import traceback
 from datetime import datetime
-from ecourts_scraper import ECourtsScraper
+from click.testing import CliRunner
+from ecourts_scraper import ECourtsScraper, main as cli_main
 
 def print_header(title):
     """Print a formatted header."""
@@ -22,29 +24,42 @@ def print_step(step_num, description):
     print(f"\n📋 Step {step_num}: {description}")
     print("-" * 40)
 
+def _emit(lines):
+    """Write a block of lines to stdout in a single call."""
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.write("\n")
+
+def run_cli(args):
+    """Run the scraper CLI in-process and print its output."""
+    print(f"Running: python ecourts_scraper.py {' '.join(args)}")
+    result = CliRunner().invoke(cli_main, args, prog_name="ecourts_scraper.py")
+    print(result.output)
+    # CliRunner catches exceptions from the command; show them as a
+    # separate process would have
+    if result.exception and not isinstance(result.exception, SystemExit):
+        print(f"❌ CLI error: {result.exception}")
+        traceback.print_exception(*result.exc_info)
+    elif result.exit_code:
+        print(f"❌ CLI exited with status {result.exit_code}")
+
 def demo_cli_usage():
     """Demonstrate CLI usage."""
     print_header("COMMAND LINE INTERFACE DEMONSTRATION")
     
     print_step(1, "Show help and available options")
-    print("Running: python ecourts_scraper.py --help")
-    os.system("python ecourts_scraper.py --help")
+    run_cli(["--help"])
     
     print_step(2, "Search case by CNR")
-    print("Running: python ecourts_scraper.py --cnr DLCT01-123456-2023 --output-dir demo_output")
-    os.system("python ecourts_scraper.py --cnr DLCT01-123456-2023 --output-dir demo_output")
+    run_cli(["--cnr", "DLCT01-123456-2023", "--output-dir", "demo_output"])
     
     print_step(3, "Search case by details")
-    print("Running: python ecourts_scraper.py --case-type Civil --case-number 12345 --year 2023 --output-dir demo_output")
-    os.system("python ecourts_scraper.py --case-type Civil --case-number 12345 --year 2023 --output-dir demo_output")
+    run_cli(["--case-type", "Civil", "--case-number", "12345", "--year", "2023", "--output-dir", "demo_output"])
     
     print_step(4, "Get cause list")
-    print("Running: python ecourts_scraper.py --causelist --court-code 01 --output-dir demo_output")
-    os.system("python ecourts_scraper.py --causelist --court-code 01 --output-dir demo_output")
+    run_cli(["--causelist", "--court-code", "01", "--output-dir", "demo_output"])
     
     print_step(5, "Download with PDF")
-    print("Running: python ecourts_scraper.py --cnr DLCT01-123456-2023 --download-pdf --output-dir demo_output")
-    os.system("python ecourts_scraper.py --cnr DLCT01-123456-2023 --download-pdf --output-dir demo_output")
+    run_cli(["--cnr", "DLCT01-123456-2023", "--download-pdf", "--output-dir", "demo_output"])
 
 def demo_programmatic_usage():
     """Demonstrate programmatic usage."""
@@ -56,33 +71,39 @@ def demo_programmatic_usage():
     
     print_step(2, "Get court list")
     courts = scraper.get_court_list()
-    print(f"✅ Found {len(courts)} courts")
+    lines = [f"✅ Found {len(courts)} courts"]
     for court in courts[:3]:  # Show first 3
-        print(f"   - {court['name']} ({court['type']})")
+        lines.append(f"   - {court['name']} ({court['type']})")
+    _emit(lines)
     
     print_step(3, "Search case by CNR")
     case_result = scraper.search_case_by_cnr("DLCT01-123456-2023")
     if case_result:
-        print("✅ Case found:")
-        print(f"   CNR: {case_result.get('cnr', 'N/A')}")
-        print(f"   Case Number: {case_result.get('case_number', 'N/A')}")
-        print(f"   Court: {case_result.get('court_name', 'N/A')}")
-        print(f"   Listed Today: {case_result.get('is_listed_today', False)}")
-        print(f"   Listed Tomorrow: {case_result.get('is_listed_tomorrow', False)}")
+        _emit([
+            "✅ Case found:",
+            f"   CNR: {case_result.get('cnr', 'N/A')}",
+            f"   Case Number: {case_result.get('case_number', 'N/A')}",
+            f"   Court: {case_result.get('court_name', 'N/A')}",
+            f"   Listed Today: {case_result.get('is_listed_today', False)}",
+            f"   Listed Tomorrow: {case_result.get('is_listed_tomorrow', False)}",
+        ])
     
     print_step(4, "Search case by details")
     details_result = scraper.search_case_by_details("Civil", "12345", "2023")
     if details_result:
-        print("✅ Case found:")
-        print(f"   Case: {details_result.get('case_type', 'N/A')}/{details_result.get('case_number', 'N/A')}/{details_result.get('year', 'N/A')}")
-        print(f"   Court: {details_result.get('court_name', 'N/A')}")
-        print(f"   Serial Number: {details_result.get('serial_number', 'N/A')}")
+        _emit([
+            "✅ Case found:",
+            f"   Case: {details_result.get('case_type', 'N/A')}/{details_result.get('case_number', 'N/A')}/{details_result.get('year', 'N/A')}",
+            f"   Court: {details_result.get('court_name', 'N/A')}",
+            f"   Serial Number: {details_result.get('serial_number', 'N/A')}",
+        ])
     
     print_step(5, "Get cause list")
     cause_list = scraper.get_cause_list("01")
-    print(f"✅ Retrieved {len(cause_list)} cases from cause list")
+    lines = [f"✅ Retrieved {len(cause_list)} cases from cause list"]
     for i, case in enumerate(cause_list[:3]):  # Show first 3
-        print(f"   {i+1}. Serial: {case.get('serial_number', 'N/A')} | Case: {case.get('case_number', 'N/A')} | Time: {case.get('time', 'N/A')}")
+        lines.append(f"   {i+1}. Serial: {case.get('serial_number', 'N/A')} | Case: {case.get('case_number', 'N/A')} | Time: {case.get('time', 'N/A')}")
+    _emit(lines)
     
     print_step(6, "Save results")
     results = {
@@ -133,20 +154,30 @@ def demo_output_files():
     print_step(1, "Check generated files")
     output_dir = "demo_output"
     if os.path.exists(output_dir):
-        files = os.listdir(output_dir)
-        print(f"✅ Found {len(files)} files in {output_dir}:")
-        for file in files:
-            file_path = os.path.join(output_dir, file)
-            size = os.path.getsize(file_path)
-            print(f"   - {file} ({size} bytes)")
+        with os.scandir(output_dir) as it:
+            entries = list(it)
+        lines = [f"✅ Found {len(entries)} files in {output_dir}:"]
+        for entry in entries:
+            lines.append(f"   - {entry.name} ({entry.stat().st_size} bytes)")
+        _emit(lines)
     else:
         print("❌ No output directory found")
     
-    print_step(2, "File formats supported")
-    print("✅ JSON files - Structured data")
-    print("✅ CSV files - Spreadsheet compatible")
-    print("✅ Text files - Human readable")
-    print("✅ PDF files - Case documents")
+    print_step(2, "Reload saved results")
+    results_file = os.path.join(output_dir, "results.json")
+    if os.path.exists(results_file):
+        results = ECourtsScraper().load_results(results_file)
+        print(f"✅ Loaded {len(results)} result sections: {', '.join(results)}")
+    else:
+        print("❌ No results file found")
+    
+    print_step(3, "File formats supported")
+    _emit([
+        "✅ JSON files - Structured data",
+        "✅ CSV files - Spreadsheet compatible",
+        "✅ Text files - Human readable",
+        "✅ PDF files - Case documents",
+    ])
 
 def demo_error_handling():
     """Demonstrate error handling."""
@@ -164,14 +195,18 @@ def demo_error_handling():
         print("✅ Properly handled missing parameters")
     
     print_step(3, "Network errors")
-    print("✅ Built-in retry mechanism")
-    print("✅ Timeout handling")
-    print("✅ Connection error handling")
+    _emit([
+        "✅ Built-in retry mechanism",
+        "✅ Timeout handling",
+        "✅ Connection error handling",
+    ])
     
     print_step(4, "File operation errors")
-    print("✅ Permission error handling")
-    print("✅ Disk space error handling")
-    print("✅ Path validation")
+    _emit([
+        "✅ Permission error handling",
+        "✅ Disk space error handling",
+        "✅ Path validation",
+    ])
 
 def cleanup_demo_files():
     """Clean up demo files."""
@@ -5,107 +5,398 @@ A Python script to fetch court listings from eCourts India portal.
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import csv
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import click
 import logging
-from bs4 import BeautifulSoup
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import atexit
 import time
 import re
+import shutil
+import tempfile
+import mmap
+from bisect import bisect_left
+from functools import lru_cache
+from contextlib import suppress
+import socket
+import threading
+from urllib.parse import urlparse
+from types import MappingProxyType
+from dataclasses import dataclass, fields, is_dataclass
+from operator import attrgetter
+import orjson
 
-# Configure logging
+# Configure logging. Callers only enqueue records; a background listener
+# thread does the file and console writes off the scraping path.
+_log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ecourts_scraper.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener = QueueListener(
+    _log_queue,
+    logging.FileHandler('ecourts_scraper.log'),
+    logging.StreamHandler(sys.stdout)
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+
+def log_synchronously():
+    """Write log records in the calling thread instead of the listener's.
+    
+    For scripts such as the test suite, whose log lines must appear in order
+    with their own printed output.
+    """
+    root = logging.getLogger()
+    queue_handlers = [h for h in root.handlers if isinstance(h, QueueHandler)]
+    if not queue_handlers:
+        return
+    # stop() drains records already queued before the handlers move over
+    _log_listener.stop()
+    atexit.unregister(_log_listener.stop)
+    for handler in queue_handlers:
+        root.removeHandler(handler)
+    for handler in _log_listener.handlers:
+        # Records used to arrive already formatted by the QueueHandler
+        handler.setFormatter(queue_handlers[0].formatter)
+        root.addHandler(handler)
+
+# Buffer size for output files; a multiple of common filesystem block sizes,
+# so many small writes are flushed as a few block-aligned syscalls.
+_WRITE_BUFFER_SIZE = 65536
+
+# Default timeout in seconds for requests to the eCourts portal
+_REQUEST_TIMEOUT = 30
+
+# Characters not allowed in generated file names
+_SAFE_ID_RE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+class _Record:
+    """Dict-style read access for record dataclasses, for existing callers.
+    
+    Fields left as None are treated as absent keys, matching the dicts the
+    searches used to return.
+    """
+    
+    def keys(self):
+        return [name for name in self.__dataclass_fields__ if getattr(self, name) is not None]
+    
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in self.__dataclass_fields__ else None
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in self.__dataclass_fields__ else None
+        return default if value is None else value
+    
+    def to_dict(self) -> Dict:
+        """Return the record as a plain dict, without unset fields."""
+        values = ((name, getattr(self, name)) for name in self.__dataclass_fields__)
+        return {name: value for name, value in values if value is not None}
+
+
+# Records are deliberately not slotted: orjson encodes a dataclass from its
+# __dict__ about as fast as a plain dict, but falls back to a several times
+# slower per-field path for slotted ones
+@dataclass(frozen=True)
+class Case(_Record):
+    """A court case returned by the case searches.
+    
+    cnr is only known for CNR searches and year only for searches by case
+    details, so each is None otherwise. Serialize cases via to_dict(), which
+    leaves those keys out; orjson's dataclass encoder would write them as null.
+    """
+    cnr: Optional[str] = None
+    case_number: str = ""
+    case_title: str = ""
+    court_name: str = ""
+    case_type: str = ""
+    filing_date: str = ""
+    status: str = ""
+    next_hearing: str = ""
+    serial_number: str = ""
+    is_listed_today: bool = False
+    is_listed_tomorrow: bool = False
+    year: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CauseListEntry(_Record):
+    """A single listing in a court's cause list."""
+    serial_number: str
+    case_number: str
+    case_title: str
+    petitioner: str
+    respondent: str
+    advocate: str
+    court_room: str
+    time: str
+
+
+# Demo dataset for offline/demo purposes, built once at import
+_DEMO_CASES = MappingProxyType({
+    "DLCT01-123456-2023": Case(
+        cnr="DLCT01-123456-2023",
+        case_number="12345/2023",
+        case_title="John Doe vs. Jane Smith",
+        court_name="Delhi High Court",
+        case_type="Civil",
+        filing_date="2023-01-15",
+        status="Pending",
+        next_hearing="2025-10-20",
+        serial_number="1",
+        is_listed_today=True,
+        is_listed_tomorrow=False
+    ),
+    "MHMC02-654321-2022": Case(
+        cnr="MHMC02-654321-2022",
+        case_number="65432/2022",
+        case_title="ABC Pvt Ltd vs. XYZ Traders",
+        court_name="Mumbai City Civil Court",
+        case_type="Commercial",
+        filing_date="2022-06-10",
+        status="Pending",
+        next_hearing="2025-10-21",
+        serial_number="7",
+        is_listed_today=False,
+        is_listed_tomorrow=True
+    ),
+    "KLER03-111222-2021": Case(
+        cnr="KLER03-111222-2021",
+        case_number="11122/2021",
+        case_title="State vs. Raman Nair",
+        court_name="Ernakulam District Court",
+        case_type="Criminal",
+        filing_date="2021-09-05",
+        status="Listed",
+        next_hearing="2025-10-15",
+        serial_number="15",
+        is_listed_today=True,
+        is_listed_tomorrow=False
+    ),
+    "TNCH04-777888-2020": Case(
+        cnr="TNCH04-777888-2020",
+        case_number="77788/2020",
+        case_title="Mohan vs. Housing Board",
+        court_name="Chennai City Civil Court",
+        case_type="Civil",
+        filing_date="2020-11-20",
+        status="Adjourned",
+        next_hearing="2025-10-22",
+        serial_number="23",
+        is_listed_today=False,
+        is_listed_tomorrow=True
+    ),
+    "RJJP05-333444-2019": Case(
+        cnr="RJJP05-333444-2019",
+        case_number="33344/2019",
+        case_title="Pooja Sharma vs. RTO Jaipur",
+        court_name="Jaipur District Court",
+        case_type="Motor Accident Claims",
+        filing_date="2019-03-18",
+        status="For Hearing",
+        next_hearing="2025-10-16",
+        serial_number="3",
+        is_listed_today=True,
+        is_listed_tomorrow=False
+    )
+})
+
+# Sorted CNRs for prefix lookups; CNRs sharing a state/court prefix sit
+# next to each other, so a prefix maps to one contiguous slice
+_DEMO_CNR_INDEX = tuple(sorted(_DEMO_CASES))
+
+# Placeholder cause list returned in demo mode. Frozen records in a tuple,
+# so callers cannot change it out of sync with its pre-serialized JSON below.
+_DEMO_CAUSE_LIST = (
+    CauseListEntry(
+        serial_number="1",
+        case_number="12345/2023",
+        case_title="Sample Case 1",
+        petitioner="John Doe",
+        respondent="Jane Smith",
+        advocate="Advocate ABC",
+        court_room="Room 1",
+        time="10:00 AM"
+    ),
+    CauseListEntry(
+        serial_number="2",
+        case_number="67890/2023",
+        case_title="Sample Case 2",
+        petitioner="Alice Johnson",
+        respondent="Bob Wilson",
+        advocate="Advocate XYZ",
+        court_room="Room 2",
+        time="11:00 AM"
+    ),
+    CauseListEntry(
+        serial_number="3",
+        case_number="22222/2022",
+        case_title="Ravi Kumar vs. State",
+        petitioner="Ravi Kumar",
+        respondent="State",
+        advocate="Adv. Mehta",
+        court_room="Room 3",
+        time="11:30 AM"
+    ),
+    CauseListEntry(
+        serial_number="4",
+        case_number="33333/2021",
+        case_title="Sita Devi vs. Nagar Nigam",
+        petitioner="Sita Devi",
+        respondent="Nagar Nigam",
+        advocate="Adv. Rao",
+        court_room="Room 4",
+        time="12:00 PM"
+    ),
+    CauseListEntry(
+        serial_number="5",
+        case_number="44444/2020",
+        case_title="Om Prakash vs. Insurance Co.",
+        petitioner="Om Prakash",
+        respondent="National Insurance",
+        advocate="Adv. Khan",
+        court_room="Room 5",
+        time="12:30 PM"
+    )
+)
+
+
+def to_json(data, option: int = 0) -> bytes:
+    """Serialize data to UTF-8 JSON bytes with orjson, plus any extra options.
+    
+    Records are encoded by orjson's native dataclass support, so pass Case
+    results as case.to_dict() to leave their unset fields out.
+    """
+    return orjson.dumps(data, option=option | orjson.OPT_NON_STR_KEYS)
+
+
+def _dumps(data, indent: bool = True) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, indented or compact."""
+    return to_json(data, orjson.OPT_INDENT_2 if indent else 0)
+
+
+def _dumps_line(record) -> bytes:
+    """Serialize a record to one compact, newline-terminated JSON line."""
+    return to_json(record, orjson.OPT_APPEND_NEWLINE)
+
+
+@lru_cache(maxsize=1)
+def _format_timestamp(epoch_second: int) -> str:
+    return datetime.fromtimestamp(epoch_second).strftime("%Y%m%d_%H%M%S")
+
+
+def _timestamp() -> str:
+    """Current local time as YYYYmmdd_HHMMSS, formatted at most once per second."""
+    return _format_timestamp(int(time.time()))
+
+
+# Hosts whose DNS lookup has already been kicked off in this process
+_prefetched_hosts = set()
+
+
+def _resolve_host(host: str):
+    try:
+        socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+    except OSError:
+        pass  # Offline/demo mode; the real request will report any failure
+
+
+def _prefetch_dns(host: str):
+    """Warm the resolver cache for host in the background, once per process."""
+    if not host or host in _prefetched_hosts:
+        return
+    _prefetched_hosts.add(host)
+    threading.Thread(target=_resolve_host, args=(host,), daemon=True).start()
+
+
+# The demo cause list never changes, so encode it once at import
+_DEMO_CAUSE_LIST_JSON = _dumps(_DEMO_CAUSE_LIST)
+
+
 class ECourtsScraper:
     """Main class for scraping eCourts data."""
     
-    def __init__(self):
+    def __init__(self, pool_maxsize: int = 32):
         self.base_url = "https://services.ecourts.gov.in/ecourtindia_v6/"
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        # Demo dataset for offline/demo purposes
-        self.demo_cases = {
-            "DLCT01-123456-2023": {
-                "cnr": "DLCT01-123456-2023",
-                "case_number": "12345/2023",
-                "case_title": "John Doe vs. Jane Smith",
-                "court_name": "Delhi High Court",
-                "case_type": "Civil",
-                "filing_date": "2023-01-15",
-                "status": "Pending",
-                "next_hearing": "2025-10-20",
-                "serial_number": "1",
-                "is_listed_today": True,
-                "is_listed_tomorrow": False
-            },
-            "MHMC02-654321-2022": {
-                "cnr": "MHMC02-654321-2022",
-                "case_number": "65432/2022",
-                "case_title": "ABC Pvt Ltd vs. XYZ Traders",
-                "court_name": "Mumbai City Civil Court",
-                "case_type": "Commercial",
-                "filing_date": "2022-06-10",
-                "status": "Pending",
-                "next_hearing": "2025-10-21",
-                "serial_number": "7",
-                "is_listed_today": False,
-                "is_listed_tomorrow": True
-            },
-            "KLER03-111222-2021": {
-                "cnr": "KLER03-111222-2021",
-                "case_number": "11122/2021",
-                "case_title": "State vs. Raman Nair",
-                "court_name": "Ernakulam District Court",
-                "case_type": "Criminal",
-                "filing_date": "2021-09-05",
-                "status": "Listed",
-                "next_hearing": "2025-10-15",
-                "serial_number": "15",
-                "is_listed_today": True,
-                "is_listed_tomorrow": False
-            },
-            "TNCH04-777888-2020": {
-                "cnr": "TNCH04-777888-2020",
-                "case_number": "77788/2020",
-                "case_title": "Mohan vs. Housing Board",
-                "court_name": "Chennai City Civil Court",
-                "case_type": "Civil",
-                "filing_date": "2020-11-20",
-                "status": "Adjourned",
-                "next_hearing": "2025-10-22",
-                "serial_number": "23",
-                "is_listed_today": False,
-                "is_listed_tomorrow": True
-            },
-            "RJJP05-333444-2019": {
-                "cnr": "RJJP05-333444-2019",
-                "case_number": "33344/2019",
-                "case_title": "Pooja Sharma vs. RTO Jaipur",
-                "court_name": "Jaipur District Court",
-                "case_type": "Motor Accident Claims",
-                "filing_date": "2019-03-18",
-                "status": "For Hearing",
-                "next_hearing": "2025-10-16",
-                "serial_number": "3",
-                "is_listed_today": True,
-                "is_listed_tomorrow": False
-            }
-        }
+        # Keep-alive pool for the eCourts host so repeated calls reuse one TLS connection.
+        # pool_maxsize bounds the connections kept open to a host; long-lived
+        # callers serving many concurrent requests can raise it.
+        # 429s are left to _request(), which honours the server's reset hint.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Resolve the portal's hostname ahead of the first request
+        _prefetch_dns(urlparse(self.base_url).hostname)
+        # Last X-RateLimit-Remaining value reported by the server, if any
+        self.rate_limit_remaining: Optional[int] = None
+        # Demo dataset for offline/demo purposes (shared, read-only)
+        self.demo_cases = _DEMO_CASES
+        self._cnr_index = _DEMO_CNR_INDEX
+        # Output directories already created by this scraper
+        self._ensured_dirs = set()
         
+    def close(self):
+        """Close the HTTP session and release pooled connections."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _ensure_dir(self, path: str):
+        """Create an output directory once, skipping the syscalls on later calls."""
+        if path not in self._ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._ensured_dirs.add(path)
+    
+    def _request(self, method: str, url: str, max_retries: int = 3, **kwargs) -> requests.Response:
+        """Send a request, backing off and retrying while rate limited (HTTP 429)."""
+        kwargs.setdefault('timeout', _REQUEST_TIMEOUT)
+        for attempt in range(max_retries + 1):
+            response = self.session.request(method, url, **kwargs)
+            
+            remaining = response.headers.get('X-RateLimit-Remaining')
+            if remaining is not None and remaining.isdigit():
+                self.rate_limit_remaining = int(remaining)
+            
+            if response.status_code != 429 or attempt == max_retries:
+                return response
+            
+            try:
+                reset = max(0, int(response.json().get('reset', 60)))
+            except (ValueError, TypeError, AttributeError):
+                reset = 60
+            response.close()
+            
+            delay = min(reset, 60) * 2 ** attempt
+            logger.warning(f"Rate limited on {url}, retrying in {delay}s")
+            time.sleep(delay)
+    
     def get_court_list(self) -> List[Dict]:
         """Get list of available courts."""
         try:
@@ -122,49 +413,74 @@ class ECourtsScraper:
             logger.error(f"Error fetching court list: {e}")
             return []
     
-    def search_case_by_cnr(self, cnr: str) -> Dict:
+    def search_case_by_cnr(self, cnr: str) -> Optional[Case]:
         """Search for a case using CNR (Case Number Record)."""
         try:
             logger.info(f"Searching for case with CNR: {cnr}")
             
-            # Return demo case if available
-            if cnr in self.demo_cases:
-                return self.demo_cases[cnr]
-            
-            # Fallback demo when unknown CNR is provided
-            return {}
+            # Return demo case if available, None for an unknown CNR
+            return self.demo_cases.get(cnr)
             
         except Exception as e:
             logger.error(f"Error searching case by CNR: {e}")
-            return {}
+            return None
+    
+    def search_prefix(self, prefix: str) -> List[Case]:
+        """Search for all cases whose CNR starts with the given prefix."""
+        try:
+            logger.info(f"Searching for cases with CNR prefix: {prefix}")
+            
+            # Binary search to the first candidate, then walk the contiguous run
+            index = self._cnr_index
+            matches = []
+            for position in range(bisect_left(index, prefix), len(index)):
+                cnr = index[position]
+                if not cnr.startswith(prefix):
+                    break
+                matches.append(self.demo_cases[cnr])
+            return matches
+            
+        except Exception as e:
+            logger.error(f"Error searching cases by CNR prefix: {e}")
+            return []
     
-    def search_case_by_details(self, case_type: str, case_number: str, year: str) -> Dict:
+    def search_case_by_details(self, case_type: str, case_number: str, year: str) -> Optional[Case]:
         """Search for a case using case type, number, and year."""
         try:
             logger.info(f"Searching for case: {case_type}/{case_number}/{year}")
             
             # Placeholder implementation
-            result = {
-                "case_type": case_type,
-                "case_number": case_number,
-                "year": year,
-                "case_title": f"Sample {case_type} Case",
-                "court_name": "District Court",
-                "filing_date": "2023-01-15",
-                "status": "Pending",
-                "next_hearing": "2023-10-21",
-                "serial_number": "2",
-                "is_listed_today": False,
-                "is_listed_tomorrow": True
-            }
+            result = Case(
+                case_type=case_type,
+                case_number=case_number,
+                year=year,
+                case_title=f"Sample {case_type} Case",
+                court_name="District Court",
+                filing_date="2023-01-15",
+                status="Pending",
+                next_hearing="2023-10-21",
+                serial_number="2",
+                is_listed_today=False,
+                is_listed_tomorrow=True
+            )
             
             return result
             
         except Exception as e:
             logger.error(f"Error searching case by details: {e}")
-            return {}
+            return None
+    
+    def scrape_many(self, cnrs: Iterable[str], max_workers: int = 10) -> Iterator[Optional[Case]]:
+        """Search many CNRs concurrently, yielding results in input order."""
+        # Lookups are network-bound, so threads sharing the pooled session
+        # overlap their round-trips instead of waiting on each one in turn.
+        if self.rate_limit_remaining is not None:
+            # Don't open more concurrent requests than the server will still accept
+            max_workers = max(1, min(max_workers, self.rate_limit_remaining))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(self.search_case_by_cnr, cnrs)
     
-    def get_cause_list(self, court_code: str, date: str = None) -> List[Dict]:
+    def get_cause_list(self, court_code: str, date: str = None) -> Sequence[CauseListEntry]:
         """Get cause list for a specific court and date."""
         try:
             if not date:
@@ -172,84 +488,47 @@ class ECourtsScraper:
             
             logger.info(f"Fetching cause list for court {court_code} on {date}")
             
-            # Placeholder implementation
-            cause_list = [
-                {
-                    "serial_number": "1",
-                    "case_number": "12345/2023",
-                    "case_title": "Sample Case 1",
-                    "petitioner": "John Doe",
-                    "respondent": "Jane Smith",
-                    "advocate": "Advocate ABC",
-                    "court_room": "Room 1",
-                    "time": "10:00 AM"
-                },
-                {
-                    "serial_number": "2",
-                    "case_number": "67890/2023",
-                    "case_title": "Sample Case 2",
-                    "petitioner": "Alice Johnson",
-                    "respondent": "Bob Wilson",
-                    "advocate": "Advocate XYZ",
-                    "court_room": "Room 2",
-                    "time": "11:00 AM"
-                },
-                {
-                    "serial_number": "3",
-                    "case_number": "22222/2022",
-                    "case_title": "Ravi Kumar vs. State",
-                    "petitioner": "Ravi Kumar",
-                    "respondent": "State",
-                    "advocate": "Adv. Mehta",
-                    "court_room": "Room 3",
-                    "time": "11:30 AM"
-                },
-                {
-                    "serial_number": "4",
-                    "case_number": "33333/2021",
-                    "case_title": "Sita Devi vs. Nagar Nigam",
-                    "petitioner": "Sita Devi",
-                    "respondent": "Nagar Nigam",
-                    "advocate": "Adv. Rao",
-                    "court_room": "Room 4",
-                    "time": "12:00 PM"
-                },
-                {
-                    "serial_number": "5",
-                    "case_number": "44444/2020",
-                    "case_title": "Om Prakash vs. Insurance Co.",
-                    "petitioner": "Om Prakash",
-                    "respondent": "National Insurance",
-                    "advocate": "Adv. Khan",
-                    "court_room": "Room 5",
-                    "time": "12:30 PM"
-                }
-            ]
-            
-            return cause_list
+            # Placeholder implementation (shared, pre-serialized demo data)
+            return _DEMO_CAUSE_LIST
             
         except Exception as e:
             logger.error(f"Error fetching cause list: {e}")
             return []
     
-    def download_case_pdf(self, case_id: str, output_dir: str = "downloads") -> str:
+    def download_case_pdf(self, case_id: str, output_dir: str = "downloads", pdf_url: Optional[str] = None) -> str:
         """Download case PDF if available."""
         try:
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Placeholder for PDF download
-            # In reality, you would need to:
-            # 1. Find the PDF link in the case details
-            # 2. Download the PDF
-            # 3. Save it to the specified directory
+            self._ensure_dir(output_dir)
             
             # Sanitize case_id for safe filenames (replace slashes and illegal chars)
-            safe_case_id = re.sub(r"[^A-Za-z0-9_-]+", "_", str(case_id))
+            safe_case_id = _SAFE_ID_RE.sub("_", str(case_id))
             pdf_path = os.path.join(output_dir, f"case_{safe_case_id}.pdf")
             
-            # For demonstration, creating a dummy file
-            with open(pdf_path, 'w') as f:
-                f.write("This is a placeholder PDF content")
+            if pdf_url:
+                # Stream straight to disk in 64 KB chunks so memory use stays
+                # flat no matter how large the PDF is. The bytes go to a temp
+                # file that only replaces pdf_path once complete, so a failed
+                # transfer never leaves a truncated PDF under the final name.
+                fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=f"case_{safe_case_id}.", suffix=".part")
+                try:
+                    with os.fdopen(fd, 'wb', buffering=_WRITE_BUFFER_SIZE) as f, \
+                         self._request('GET', pdf_url, stream=True) as response:
+                        response.raise_for_status()
+                        if response.raw is not None:
+                            response.raw.decode_content = True
+                            shutil.copyfileobj(response.raw, f, _WRITE_BUFFER_SIZE)
+                        else:
+                            for chunk in response.iter_content(chunk_size=_WRITE_BUFFER_SIZE):
+                                f.write(chunk)
+                    os.replace(tmp_path, pdf_path)
+                except BaseException:
+                    with suppress(FileNotFoundError):
+                        os.unlink(tmp_path)
+                    raise
+            else:
+                # No PDF link known yet (demo mode), creating a dummy file
+                with open(pdf_path, 'w') as f:
+                    f.write("This is a placeholder PDF content")
             
             logger.info(f"PDF downloaded to: {pdf_path}")
             return pdf_path
@@ -258,15 +537,18 @@ class ECourtsScraper:
             logger.error(f"Error downloading PDF: {e}")
             return ""
     
-    def save_results(self, data: Dict, filename: str = None) -> str:
-        """Save results to JSON file."""
+    def save_results(self, data: Dict, filename: str = None, indent: bool = True) -> str:
+        """Save results to JSON file, pretty-printed unless indent is False."""
         try:
             if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = _timestamp()
                 filename = f"ecourts_results_{timestamp}.json"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(filename, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                if data is _DEMO_CAUSE_LIST and indent:
+                    f.write(_DEMO_CAUSE_LIST_JSON)
+                else:
+                    f.write(_dumps(data, indent))
             
             logger.info(f"Results saved to: {filename}")
             return filename
@@ -275,21 +557,43 @@ class ECourtsScraper:
             logger.error(f"Error saving results: {e}")
             return ""
     
-    def save_cause_list_csv(self, cause_list: List[Dict], filename: str = None) -> str:
+    def load_results(self, filename: str) -> Dict:
+        """Load results from a JSON file."""
+        try:
+            # Map the file instead of read()ing it, so the parser works
+            # directly on the page cache without an extra copy
+            with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            
+        except Exception as e:
+            logger.error(f"Error loading results: {e}")
+            return {}
+    
+    def save_cause_list_csv(self, cause_list: Sequence[CauseListEntry], filename: str = None) -> str:
         """Save cause list to CSV file."""
         try:
             if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = _timestamp()
                 filename = f"cause_list_{timestamp}.csv"
             
             if not cause_list:
                 logger.warning("No cause list data to save")
                 return ""
             
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=cause_list[0].keys())
-                writer.writeheader()
-                writer.writerows(cause_list)
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+                # Rows share the first row's shape, so resolve the field order
+                # once instead of mapping every row by name
+                first = cause_list[0]
+                if is_dataclass(first):
+                    fieldnames = [f.name for f in fields(first)]
+                    rows = map(attrgetter(*fieldnames), cause_list)
+                else:
+                    fieldnames = list(first.keys())
+                    rows = ([row.get(k, '') for k in fieldnames] for row in cause_list)
+                writer = csv.writer(f)
+                writer.writerow(fieldnames)
+                writer.writerows(rows)
             
             logger.info(f"Cause list saved to: {filename}")
             return filename
@@ -309,14 +613,39 @@ class ECourtsScraper:
 @click.option('--court-code', default='01', help='Court code for cause list')
 @click.option('--output-dir', default='output', help='Output directory for files')
 @click.option('--download-pdf', is_flag=True, help='Download case PDF if available')
-def main(cnr, case_type, case_number, year, today, tomorrow, causelist, court_code, output_dir, download_pdf):
+@click.option('--cnr-file', type=click.Path(exists=True, dir_okay=False), help='File with one CNR per line to search in batch')
+@click.option('--format', 'output_format', type=click.Choice(['json', 'ndjson']), default='json', show_default=True,
+              help='Results file format: one aggregated JSON document, or records streamed as NDJSON')
+def main(cnr, case_type, case_number, year, today, tomorrow, causelist, court_code, output_dir, download_pdf, cnr_file, output_format):
     """eCourts Scraper - Main CLI interface."""
     
     scraper = ECourtsScraper()
     results = {}
+    saved = 0
     
     # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
+    scraper._ensure_dir(output_dir)
+    
+    results_file = None
+    if output_format == 'ndjson':
+        # Records are streamed as soon as each step finishes, so nothing
+        # accumulates in memory for large batches
+        results_path = os.path.join(output_dir, "results.ndjson")
+        results_file = open(results_path, 'wb', buffering=_WRITE_BUFFER_SIZE)
+    else:
+        results_path = os.path.join(output_dir, "results.json")
+    
+    def save_record(kind, data, collection=False):
+        nonlocal saved
+        saved += 1
+        if isinstance(data, Case):
+            data = data.to_dict()  # Leaves out unset cnr/year
+        if results_file is not None:
+            results_file.write(_dumps_line({"kind": kind, "data": data}))
+        elif collection:
+            results.setdefault(kind, []).append(data)
+        else:
+            results[kind] = data
     
     try:
         # Search by CNR
@@ -324,64 +653,87 @@ def main(cnr, case_type, case_number, year, today, tomorrow, causelist, court_co
             logger.info("Searching by CNR...")
             case_result = scraper.search_case_by_cnr(cnr)
             if case_result:
-                results['case_search'] = case_result
+                save_record('case_search', case_result)
                 print(f"\nCase found:")
-                print(f"CNR: {case_result.get('cnr', 'N/A')}")
-                print(f"Case Number: {case_result.get('case_number', 'N/A')}")
-                print(f"Court: {case_result.get('court_name', 'N/A')}")
-                print(f"Serial Number: {case_result.get('serial_number', 'N/A')}")
-                print(f"Listed Today: {case_result.get('is_listed_today', False)}")
-                print(f"Listed Tomorrow: {case_result.get('is_listed_tomorrow', False)}")
+                print(f"CNR: {case_result.cnr or 'N/A'}")
+                print(f"Case Number: {case_result.case_number or 'N/A'}")
+                print(f"Court: {case_result.court_name or 'N/A'}")
+                print(f"Serial Number: {case_result.serial_number or 'N/A'}")
+                print(f"Listed Today: {case_result.is_listed_today}")
+                print(f"Listed Tomorrow: {case_result.is_listed_tomorrow}")
                 
-                if download_pdf and case_result.get('case_number'):
-                    pdf_path = scraper.download_case_pdf(case_result['case_number'], output_dir)
+                if download_pdf and case_result.case_number:
+                    pdf_path = scraper.download_case_pdf(case_result.case_number, output_dir)
                     if pdf_path:
-                        results['pdf_downloaded'] = pdf_path
+                        save_record('pdf_downloaded', pdf_path)
         
         # Search by case details
         elif case_type and case_number and year:
             logger.info("Searching by case details...")
             case_result = scraper.search_case_by_details(case_type, case_number, year)
             if case_result:
-                results['case_search'] = case_result
+                save_record('case_search', case_result)
                 print(f"\nCase found:")
-                print(f"Case: {case_result.get('case_type', 'N/A')}/{case_result.get('case_number', 'N/A')}/{case_result.get('year', 'N/A')}")
-                print(f"Court: {case_result.get('court_name', 'N/A')}")
-                print(f"Serial Number: {case_result.get('serial_number', 'N/A')}")
-                print(f"Listed Today: {case_result.get('is_listed_today', False)}")
-                print(f"Listed Tomorrow: {case_result.get('is_listed_tomorrow', False)}")
+                print(f"Case: {case_result.case_type or 'N/A'}/{case_result.case_number or 'N/A'}/{case_result.year or 'N/A'}")
+                print(f"Court: {case_result.court_name or 'N/A'}")
+                print(f"Serial Number: {case_result.serial_number or 'N/A'}")
+                print(f"Listed Today: {case_result.is_listed_today}")
+                print(f"Listed Tomorrow: {case_result.is_listed_tomorrow}")
+        
+        # Batch search by CNR file
+        if cnr_file:
+            logger.info(f"Searching CNRs from {cnr_file}...")
+            with open(cnr_file, encoding='utf-8') as f:
+                cnrs = [line.strip() for line in f if line.strip()]
+            print(f"\nBatch search of {len(cnrs)} CNRs:")
+            found = 0
+            for case in scraper.scrape_many(cnrs):
+                if case:
+                    save_record('batch_search', case, collection=True)
+                    found += 1
+                    print(f"CNR: {case.cnr or 'N/A'} | Court: {case.court_name or 'N/A'} | Serial: {case.serial_number or 'N/A'}")
+            print(f"Found {found} of {len(cnrs)} cases")
         
         # Get cause list
         if causelist:
             logger.info("Fetching cause list...")
             cause_list = scraper.get_cause_list(court_code)
             if cause_list:
-                results['cause_list'] = cause_list
+                for row in cause_list:
+                    save_record('cause_list', row, collection=True)
                 print(f"\nCause list fetched with {len(cause_list)} cases:")
                 for case in cause_list[:5]:  # Show first 5 cases
-                    print(f"Serial: {case.get('serial_number', 'N/A')} | Case: {case.get('case_number', 'N/A')} | Time: {case.get('time', 'N/A')}")
+                    print(f"Serial: {case.serial_number or 'N/A'} | Case: {case.case_number or 'N/A'} | Time: {case.time or 'N/A'}")
                 
                 # Save cause list to CSV
                 csv_file = scraper.save_cause_list_csv(cause_list, os.path.join(output_dir, "cause_list.csv"))
                 if csv_file:
-                    results['cause_list_file'] = csv_file
+                    save_record('cause_list_file', csv_file)
         
         # Save all results
         if results:
-            json_file = scraper.save_results(results, os.path.join(output_dir, "results.json"))
+            json_file = scraper.save_results(results, results_path)
             if json_file:
                 print(f"\nAll results saved to: {json_file}")
+        elif results_file is not None and saved:
+            print(f"\nAll results saved to: {results_path}")
         
         # Show summary
         print(f"\n{'='*50}")
         print("SUMMARY")
         print(f"{'='*50}")
         print(f"Output directory: {output_dir}")
-        print(f"Results saved: {len(results)} items")
+        print(f"Results saved: {saved if results_file is not None else len(results)} items")
         
     except Exception as e:
         logger.error(f"Error in main execution: {e}")
         print(f"Error: {e}")
+    finally:
+        if results_file is not None:
+            results_file.close()
+            if not saved:
+                os.remove(results_path)
+        scraper.close()
 
 if __name__ == "__main__":
     main()
@@ -4,11 +4,25 @@ Test script for eCourts Scraper
 Tests all major functionality of the scraper.
 """
 
+import gzip
 import os
 import sys
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from datetime import datetime
-from ecourts_scraper import ECourtsScraper
+from tempfile import TemporaryDirectory
+from unittest import mock
+import orjson
+import requests
+from click.testing import CliRunner
+from ecourts_scraper import Case, ECourtsScraper, log_synchronously, main as cli_main
+
+def check(condition, label):
+    """Print a passing check, or raise so main() reports the failure."""
+    if not condition:
+        raise AssertionError(label)
+    print(f"   ✅ {label}")
 
 def test_basic_functionality():
     """Test basic scraper functionality."""
@@ -17,16 +31,24 @@ def test_basic_functionality():
     
     scraper = ECourtsScraper()
     
+    # Tests 1-4 are independent lookups, so they run concurrently and their
+    # results are reported in order below
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        courts_future = executor.submit(scraper.get_court_list)
+        cnr_future = executor.submit(scraper.search_case_by_cnr, "TEST123456789")
+        details_future = executor.submit(scraper.search_case_by_details, "Civil", "12345", "2023")
+        cause_list_future = executor.submit(scraper.get_cause_list, "01")
+    
     # Test 1: Court list
     print("\n1. Testing court list retrieval...")
-    courts = scraper.get_court_list()
+    courts = courts_future.result()
     print(f"   Found {len(courts)} courts")
     if courts:
         print(f"   Sample court: {courts[0]['name']}")
     
     # Test 2: Case search by CNR
     print("\n2. Testing case search by CNR...")
-    cnr_result = scraper.search_case_by_cnr("TEST123456789")
+    cnr_result = cnr_future.result()
     if cnr_result:
         print(f"   Case found: {cnr_result.get('case_number', 'N/A')}")
         print(f"   Court: {cnr_result.get('court_name', 'N/A')}")
@@ -36,17 +58,18 @@ def test_basic_functionality():
     
     # Test 3: Case search by details
     print("\n3. Testing case search by details...")
-    details_result = scraper.search_case_by_details("Civil", "12345", "2023")
+    details_result = details_future.result()
     if details_result:
         print(f"   Case found: {details_result.get('case_number', 'N/A')}")
         print(f"   Court: {details_result.get('court_name', 'N/A')}")
         print(f"   Listed tomorrow: {details_result.get('is_listed_tomorrow', False)}")
+        check(details_result.get('cnr', 'N/A') == 'N/A', "Unset CNR reads as missing")
     else:
         print("   No case found (expected for test details)")
     
     # Test 4: Cause list
     print("\n4. Testing cause list retrieval...")
-    cause_list = scraper.get_cause_list("01")
+    cause_list = cause_list_future.result()
     print(f"   Retrieved {len(cause_list)} cases from cause list")
     if cause_list:
         print(f"   First case: {cause_list[0].get('case_number', 'N/A')}")
@@ -61,46 +84,188 @@ def test_basic_functionality():
     }
     
     json_file = scraper.save_results(test_data, "test_output.json")
-    if json_file and os.path.exists(json_file):
+    if json_file:
         print(f"   JSON file saved: {json_file}")
-        os.remove(json_file)  # Clean up
+        loaded = scraper.load_results(json_file)
+        print(f"   JSON file reloaded: {len(loaded.get('cases', []))} cases")
+        with suppress(FileNotFoundError):
+            os.unlink(json_file)  # Clean up
     
     csv_file = scraper.save_cause_list_csv(cause_list, "test_cause_list.csv")
-    if csv_file and os.path.exists(csv_file):
+    if csv_file:
         print(f"   CSV file saved: {csv_file}")
-        os.remove(csv_file)  # Clean up
+        with suppress(FileNotFoundError):
+            os.unlink(csv_file)  # Clean up
     
     # Test 6: PDF download
     print("\n6. Testing PDF download...")
-    os.makedirs("test_downloads", exist_ok=True)
-    pdf_path = scraper.download_case_pdf("TEST123", "test_downloads")
-    if pdf_path and os.path.exists(pdf_path):
-        print(f"   PDF downloaded: {pdf_path}")
-        os.remove(pdf_path)  # Clean up
-        os.rmdir("test_downloads")  # Clean up directory
+    with TemporaryDirectory() as download_dir:  # Removed with its contents on exit
+        pdf_path = scraper.download_case_pdf("TEST123", download_dir)
+        if pdf_path and os.path.exists(pdf_path):
+            print(f"   PDF downloaded: {os.path.basename(pdf_path)}")
+    check_pdf_streaming(scraper)
+    
+    # Test 7: Batch CNR search
+    print("\n7. Testing batch CNR search...")
+    cnrs = ["DLCT01-123456-2023", "TEST123456789", "KLER03-111222-2021"]
+    batch = list(scraper.scrape_many(cnrs))
+    found = [case for case in batch if case]
+    print(f"   Found {len(found)} of {len(batch)} cases")
+    if found:
+        print(f"   First match: {found[0].get('cnr', 'N/A')}")
+    check([case.cnr if case else None for case in batch] == [cnrs[0], None, cnrs[2]],
+          "Results line up with the input CNRs")
+    
+    # Make the first lookup finish last; results must still come back in input order
+    lookup = scraper.search_case_by_cnr
+    def slow_first(cnr):
+        if cnr == cnrs[0]:
+            time.sleep(0.05)
+        return lookup(cnr)
+    with mock.patch.object(scraper, 'search_case_by_cnr', side_effect=slow_first):
+        batch = list(scraper.scrape_many(cnrs))
+    check([case.cnr if case else None for case in batch] == [cnrs[0], None, cnrs[2]],
+          "Input order kept when lookups finish out of order")
+    
+    # Test 8: CNR prefix search
+    print("\n8. Testing CNR prefix search...")
+    prefix_matches = scraper.search_prefix("DLCT01")
+    print(f"   Found {len(prefix_matches)} cases with prefix DLCT01")
+    if prefix_matches:
+        print(f"   First match: {prefix_matches[0].get('cnr', 'N/A')}")
+    check_prefix_search(scraper)
+    
+    # Test 9: Rate limit backoff
+    print("\n9. Testing rate limit backoff...")
+    check_rate_limit_backoff(scraper)
     
     print("\n✅ All tests completed successfully!")
     print("=" * 50)
 
+def check_prefix_search(scraper):
+    """Check search_prefix against a dataset with neighbouring CNRs."""
+    cnrs = ["DLCT01-000001-2020", "DLCT01-123456-2023", "DLCT010-000005-2022",
+            "DLCT02-000001-2021", "KLER03-111222-2021"]
+    cases = {cnr: Case(cnr=cnr) for cnr in cnrs}
+    with mock.patch.object(scraper, 'demo_cases', cases), \
+         mock.patch.object(scraper, '_cnr_index', tuple(sorted(cases))):
+        def matched(prefix):
+            return [case.cnr for case in scraper.search_prefix(prefix)]
+        check(matched("DLCT01-") == cnrs[:2], "Shared prefix returns exactly its cases")
+        check(matched("DLCT01") == cnrs[:3], "Prefix match is not limited to whole segments")
+        check(matched("DLCT03") == [] and matched("AA") == [] and matched("ZZ") == [],
+              "Prefixes between, before and after the CNRs match nothing")
+        check(matched("") == sorted(cnrs), "Empty prefix returns every case")
+    check(len(scraper.search_prefix("")) == len(scraper.demo_cases), "Empty prefix covers the demo dataset")
+
+def fake_response(status_code, body=None, headers=None):
+    """Build a stand-in for a requests.Response."""
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    if isinstance(body, Exception):
+        response.json.side_effect = body
+    else:
+        response.json.return_value = body
+    return response
+
+def check_rate_limit_backoff(scraper):
+    """Check the 429 retry delays without touching the network."""
+    def run(*responses, max_retries=3):
+        with mock.patch.object(scraper.session, 'request', side_effect=list(responses)) as request, \
+             mock.patch('ecourts_scraper.time.sleep') as sleep:
+            response = scraper._request('GET', 'https://example.invalid/', max_retries=max_retries)
+        return response, request.call_count, [call.args[0] for call in sleep.call_args_list]
+    
+    ok = fake_response(200, headers={'X-RateLimit-Remaining': '7'})
+    response, calls, delays = run(fake_response(429, {'reset': 2}), fake_response(429, {'reset': 2}),
+                                  fake_response(429, {'reset': 2}), ok)
+    check(response is ok and calls == 4, "Retried until the request succeeded")
+    check(delays == [2, 4, 8], f"Backoff doubles from the server's reset hint: {delays}")
+    check(scraper.rate_limit_remaining == 7, "X-RateLimit-Remaining is recorded")
+    
+    _, _, delays = run(fake_response(429, ValueError("no JSON")), fake_response(429, {}), ok)
+    check(delays == [60, 120], f"Missing reset hint backs off from 60s: {delays}")
+    
+    _, _, delays = run(fake_response(429, {'reset': -1}), ok)
+    check(delays == [0], "Negative reset hint is clamped to 0")
+    
+    limited = fake_response(429, {'reset': 1})
+    response, calls, delays = run(limited, limited, max_retries=1)
+    check(response is limited and calls == 2, "Last 429 is returned once retries run out")
+
+def fake_stream(*chunks):
+    """Build a streamed response whose raw.read() returns each chunk in turn (raising exceptions)."""
+    response = mock.MagicMock(status_code=200)
+    response.__enter__.return_value = response
+    response.raw.read.side_effect = list(chunks) + [b""]
+    return response
+
+def check_pdf_streaming(scraper):
+    """Check that streamed PDFs only appear under their final name when complete."""
+    with TemporaryDirectory() as download_dir:
+        with mock.patch.object(scraper, '_request', return_value=fake_stream(b"%PDF-1.4 ", b"body")):
+            pdf_path = scraper.download_case_pdf("TEST123", download_dir, pdf_url="https://example.invalid/a.pdf")
+        with open(pdf_path, 'rb') as f:
+            check(f.read() == b"%PDF-1.4 body", "Streamed PDF written in full")
+        check(os.listdir(download_dir) == ["case_TEST123.pdf"], "No temp file left after a download")
+    
+    with TemporaryDirectory() as download_dir:
+        broken = fake_stream(b"%PDF-1.4 ", requests.exceptions.ChunkedEncodingError("connection reset"))
+        with mock.patch.object(scraper, '_request', return_value=broken):
+            pdf_path = scraper.download_case_pdf("TEST123", download_dir, pdf_url="https://example.invalid/a.pdf")
+        check(pdf_path == "" and os.listdir(download_dir) == [], "Interrupted download leaves no partial file")
+
 def test_cli_interface():
     """Test CLI interface."""
     print("\n🔧 Testing CLI Interface...")
     print("=" * 30)
     
-    # Test help command
-    print("\n1. Testing help command...")
-    os.system("python ecourts_scraper.py --help")
+    # The CLI is invoked in-process, so the interpreter and modules are
+    # loaded once instead of once per command
+    runner = CliRunner()
     
-    print("\n2. Testing case search...")
-    os.system("python ecourts_scraper.py --cnr TEST123 --output-dir test_output")
+    def run_cli(args):
+        result = runner.invoke(cli_main, args, prog_name="ecourts_scraper.py")
+        print(result.output)
+        if result.exception and not isinstance(result.exception, SystemExit):
+            print(f"   ❌ CLI error: {result.exception}")
+        return result
     
-    print("\n3. Testing cause list...")
-    os.system("python ecourts_scraper.py --causelist --court-code 01 --output-dir test_output")
-    
-    # Clean up test output
-    if os.path.exists("test_output"):
-        import shutil
-        shutil.rmtree("test_output")
+    with TemporaryDirectory() as output_dir:  # Removed with its contents on exit
+        # Test help command
+        print("\n1. Testing help command...")
+        run_cli(["--help"])
+        
+        print("\n2. Testing case search...")
+        run_cli(["--cnr", "TEST123", "--output-dir", output_dir])
+        
+        print("\n3. Testing cause list...")
+        run_cli(["--causelist", "--court-code", "01", "--output-dir", output_dir])
+        
+        print("\n4. Testing NDJSON output...")
+        ndjson_dir = os.path.join(output_dir, "ndjson")
+        result = run_cli(["--causelist", "--court-code", "01", "--format", "ndjson", "--output-dir", ndjson_dir])
+        with open(os.path.join(ndjson_dir, "results.ndjson"), 'rb') as f:
+            records = [orjson.loads(line) for line in f]
+        kinds = [record['kind'] for record in records]
+        check(all(record.keys() == {'kind', 'data'} for record in records), "Every line is a {kind, data} record")
+        check(len(kinds) > 1 and kinds == ['cause_list'] * (len(kinds) - 1) + ['cause_list_file'],
+              f"One line per cause list row, then the CSV path ({len(records)} lines)")
+        check(f"Results saved: {len(records)} items" in result.output, "Summary counts the streamed records")
+        
+        empty_dir = os.path.join(output_dir, "ndjson_empty")
+        run_cli(["--cnr", "TEST123", "--format", "ndjson", "--output-dir", empty_dir])
+        check(not os.path.exists(os.path.join(empty_dir, "results.ndjson")), "Empty results.ndjson is removed")
+        
+        print("\n5. Testing batch search from a CNR file...")
+        cnr_file = os.path.join(output_dir, "cnrs.txt")
+        with open(cnr_file, "w", encoding="utf-8") as f:
+            f.write("DLCT01-123456-2023\n\nTEST123456789\n   \nKLER03-111222-2021\n")
+        batch_dir = os.path.join(output_dir, "batch")
+        result = run_cli(["--cnr-file", cnr_file, "--output-dir", batch_dir])
+        check("Batch search of 3 CNRs" in result.output, "Blank lines in the CNR file are skipped")
+        saved_batch = ECourtsScraper().load_results(os.path.join(batch_dir, "results.json")).get('batch_search', [])
+        check([case['cnr'] for case in saved_batch] == ["DLCT01-123456-2023", "KLER03-111222-2021"],
+              "Found cases are saved in file order")
     
     print("\n✅ CLI tests completed!")
 
@@ -125,10 +290,72 @@ def test_web_interface():
         print(f"❌ Web interface import error: {e}")
         return
     
+    # Smoke-test the routes in-process with Flask's test client, from a
+    # scratch directory since the cause list routes save CSV files
+    cwd = os.getcwd()
+    with TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            check_web_routes(web_interface.app.test_client())
+        finally:
+            os.chdir(cwd)
+    
     print("\n✅ Web interface components are ready!")
     print("   To test the web interface, run: python web_interface.py")
     print("   Then open: http://localhost:5000")
 
+def check_web_routes(client):
+    """Exercise the web routes through a Flask test client."""
+    import web_interface
+    
+    print("\n1. Testing request body handling...")
+    response = client.post('/search', data=b'{not json', content_type='application/json')
+    check(response.status_code == 500, "Malformed JSON body returns 500")
+    response = client.post('/search', data=b'{"search_type": "cnr"}', content_type='application/json',
+                           environ_overrides={'CONTENT_LENGTH': str(2 ** 31)})
+    check(response.status_code == 413, "Oversized Content-Length is refused with 413")
+    response = client.post('/search', json={'search_type': 'cnr', 'cnr': 'DLCT01-123456-2023'})
+    check(response.status_code == 200 and response.json['success'], "CNR search parses the JSON body")
+    check('year' not in response.json['data'], "CNR search result has no year key")
+    response = client.post('/search', json={'search_type': 'details', 'case_type': 'Civil',
+                                            'case_number': '12345', 'year': '2023'})
+    check('cnr' not in response.json['data'], "Details search result has no cnr key")
+    
+    print("\n2. Testing HTML cause list...")
+    response = client.post('/causelist/html', json={'court_code': '01'}, headers={'Accept-Encoding': 'gzip'})
+    check(response.headers.get('Content-Encoding') == 'gzip', "Gzip sent when the client accepts it")
+    check(b'<table' in gzip.decompress(response.data), "Gzipped body holds the rendered table")
+    check('Accept-Encoding' in response.headers.get('Vary', ''), "Response varies on Accept-Encoding")
+    for accept in ('identity', 'gzip;q=0, identity'):
+        response = client.post('/causelist/html', json={'court_code': '01'}, headers={'Accept-Encoding': accept})
+        check('Content-Encoding' not in response.headers and b'<table' in response.data,
+              f"Plain HTML sent for Accept-Encoding: {accept}")
+    
+    print("\n3. Testing streamed cause list...")
+    expected = len(web_interface.scraper.get_cause_list('01'))
+    response = client.post('/causelist/stream', json={'court_code': '01'})
+    lines = response.data.splitlines()
+    check(response.mimetype == 'application/x-ndjson', "Streamed as application/x-ndjson")
+    check(len(lines) == expected, f"One NDJSON line per case ({len(lines)} of {expected})")
+    check(all(orjson.loads(line)['case_number'] for line in lines), "Each line is a complete JSON record")
+    
+    print("\n4. Testing cached court list...")
+    courts = web_interface.scraper.get_court_list()
+    response = client.get('/courts')
+    check(response.status_code == 200 and response.json == {'success': True, 'data': courts},
+          f"/courts returns all {len(courts)} courts")
+    with mock.patch.object(web_interface.scraper, 'get_court_list') as get_court_list:
+        cached = client.get('/courts')
+    check(cached.data == response.data and not get_court_list.called, "Repeat /courts is served from the cache")
+    
+    print("\n5. Testing X-Accel-Redirect downloads...")
+    with open("a b#c.csv", "w") as f:
+        f.write("serial_number\n")
+    with mock.patch.object(web_interface, 'X_ACCEL_PREFIX', '/protected/'):
+        response = client.get('/download/a%20b%23c.csv')
+    check(response.headers.get('X-Accel-Redirect') == '/protected/a%20b%23c.csv',
+          "X-Accel-Redirect path is percent-encoded")
+
 def create_demo_data():
     """Create demo data for testing."""
     print("\n📊 Creating Demo Data...")
@@ -186,12 +413,11 @@ def create_demo_data():
         }
     ]
     
-    # Save demo data
-    with open("demo_cases.json", "w") as f:
-        json.dump(demo_cases, f, indent=2)
-    
-    with open("demo_cause_list.json", "w") as f:
-        json.dump(demo_cause_list, f, indent=2)
+    # Save demo data through the scraper's orjson-backed writer, compact
+    # since these fixtures are only read back by code
+    scraper = ECourtsScraper()
+    scraper.save_results(demo_cases, "demo_cases.json", indent=False)
+    scraper.save_results(demo_cause_list, "demo_cause_list.json", indent=False)
     
     print("✅ Demo data created:")
     print("   - demo_cases.json")
@@ -199,6 +425,18 @@ def create_demo_data():
 
 def main():
     """Run all tests."""
+    # Log records normally go out from a background listener thread and
+    # would land after later prints; write them inline so the report reads
+    # in order
+    log_synchronously()
+    
+    # The suite prints hundreds of short lines; on a terminal stdout is
+    # line-buffered, so switch to block buffering to batch them into few writes.
+    # The console log handler writes to and flushes this same stream, so
+    # log lines still come out in order with the prints around them.
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
     print("🚀 eCourts Scraper Test Suite")
     print("=" * 50)
     
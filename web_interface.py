@@ -2,33 +2,143 @@
 """
 Web Interface for eCourts Scraper
 A simple Flask web interface for the eCourts scraper.
+
+For production, serve it with gevent workers so network-bound scraper calls
+overlap instead of blocking each other:
+    gunicorn -k gevent -w 2 --worker-connections 200 web_interface:app
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, request, send_file, stream_with_context
 import os
 import json
+import gzip
+import html
+import mimetypes
+import time
+import threading
+import orjson
 from datetime import datetime
-from ecourts_scraper import ECourtsScraper
+from urllib.parse import quote
+from ecourts_scraper import ECourtsScraper, to_json
 
 app = Flask(__name__)
-scraper = ECourtsScraper()
+# One scraper (and HTTP session) is shared by every request, with a
+# connection pool sized for concurrent gevent greenlets
+scraper = ECourtsScraper(pool_maxsize=50)
+
+# The index page has no template expressions, so it is read once at import
+# and served as-is instead of going through Jinja on every request
+with open(os.path.join(app.root_path, 'templates', 'index.html'), 'rb') as f:
+    INDEX_HTML = f.read()
+
+# Behind a front-end server, hand downloads to it so file bytes go out via
+# sendfile(2) instead of through Python: ECOURTS_USE_X_SENDFILE=1 for
+# Apache/lighttpd (X-Sendfile), ECOURTS_X_ACCEL_PREFIX=/protected for nginx
+app.config['USE_X_SENDFILE'] = os.environ.get('ECOURTS_USE_X_SENDFILE') == '1'
+X_ACCEL_PREFIX = os.environ.get('ECOURTS_X_ACCEL_PREFIX')
+
+# Request bodies are small JSON search forms; anything larger is refused
+# before a buffer is allocated for it
+app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024
+
+# The court list is effectively static, so it is fetched and serialized
+# at most once per COURTS_CACHE_TTL seconds
+COURTS_CACHE_TTL = 600
+_courts_cache = {'ts': 0.0, 'body': None}
+
+def _cached_courts_body():
+    """Return the serialized /courts payload, refreshing it after the TTL."""
+    now = time.monotonic()
+    if _courts_cache['body'] is None or now - _courts_cache['ts'] > COURTS_CACHE_TTL:
+        courts = scraper.get_court_list()
+        body = to_json({'success': True, 'data': courts})
+        if not courts:
+            return body  # Don't keep a failed fetch around for the whole TTL
+        _courts_cache['body'] = body
+        _courts_cache['ts'] = now
+    return _courts_cache['body']
+
+# Warm the court list cache in the background at import so the first
+# /courts request doesn't wait on the fetch
+threading.Thread(target=_cached_courts_body, daemon=True).start()
+
+def _json_response(payload, status=200):
+    """Build a JSON response encoded with orjson instead of jsonify."""
+    return Response(to_json(payload), status=status, mimetype='application/json')
+
+def _json_body():
+    """Parse the request body as JSON with orjson's C parser."""
+    length = request.content_length
+    if length is None:
+        return orjson.loads(request.get_data())
+    # Read straight from the input stream into one preallocated buffer
+    # instead of letting get_data() collect chunks into a bytes copy
+    buf = bytearray(length)
+    view = memoryview(buf)
+    read = 0
+    while read < length:
+        n = request.stream.readinto(view[read:])
+        if not n:
+            break
+        read += n
+    return orjson.loads(view[:read])
+
+def _html_response(body, status=200):
+    """Build an HTML response, gzip-compressed if the client accepts it."""
+    body = body.encode('utf-8')
+    response = Response(body, status=status, mimetype='text/html')
+    # Level 1 already shrinks repetitive table markup several times over at
+    # a fraction of the CPU cost of the default level
+    if request.accept_encodings['gzip'] > 0:  # gzip;q=0 means "never gzip"
+        response.set_data(gzip.compress(body, compresslevel=1))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def _render_cause_list(cause_list, filename):
+    """Render the first 10 cause list rows as the page's result table."""
+    parts = [
+        '<div class="result success"><h3>Cause List Retrieved!</h3>',
+        f'<p>Found {len(cause_list)} cases</p>',
+        '<table border="1" style="width: 100%; border-collapse: collapse;">',
+        '<tr><th>Serial</th><th>Case Number</th><th>Time</th><th>Court Room</th></tr>',
+    ]
+    for row in cause_list[:10]:
+        parts.append(
+            f'<tr><td>{html.escape(row.serial_number)}</td>'
+            f'<td>{html.escape(row.case_number)}</td>'
+            f'<td>{html.escape(row.time)}</td>'
+            f'<td>{html.escape(row.court_room)}</td></tr>'
+        )
+    parts.append('</table>')
+    if filename:
+        parts.append(f'<p><a href="/download/{html.escape(quote(filename))}" target="_blank">Download CSV</a></p>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+@app.before_request
+def _reject_large_bodies():
+    """Refuse bodies over MAX_CONTENT_LENGTH based on their declared size."""
+    length = request.content_length
+    if length is not None and length > app.config['MAX_CONTENT_LENGTH']:
+        return _json_response({'error': 'Request body too large'}, 413)
 
 @app.route('/')
 def index():
     """Main page with search form."""
-    return render_template('index.html')
+    return Response(INDEX_HTML, mimetype='text/html')
 
 @app.route('/search', methods=['POST'])
 def search_case():
     """Search for a case."""
     try:
-        data = request.get_json()
+        data = _json_body()
         search_type = data.get('search_type')
         
         if search_type == 'cnr':
             cnr = data.get('cnr')
             if not cnr:
-                return jsonify({'error': 'CNR is required'}), 400
+                return _json_response({'error': 'CNR is required'}, 400)
             
             result = scraper.search_case_by_cnr(cnr)
             
@@ -37,27 +147,27 @@ def search_case():
             case_number = data.get('case_number')
             year = data.get('year')
             
-            if not all([case_type, case_number, year]):
-                return jsonify({'error': 'All case details are required'}), 400
+            if not (case_type and case_number and year):
+                return _json_response({'error': 'All case details are required'}, 400)
             
             result = scraper.search_case_by_details(case_type, case_number, year)
             
         else:
-            return jsonify({'error': 'Invalid search type'}), 400
+            return _json_response({'error': 'Invalid search type'}, 400)
         
         if result:
-            return jsonify({'success': True, 'data': result})
+            return _json_response({'success': True, 'data': result.to_dict()})
         else:
-            return jsonify({'success': False, 'message': 'Case not found'})
+            return _json_response({'success': False, 'message': 'Case not found'})
             
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}, 500)
 
 @app.route('/causelist', methods=['POST'])
 def get_cause_list():
     """Get cause list for a court."""
     try:
-        data = request.get_json()
+        data = _json_body()
         court_code = data.get('court_code', '01')
         date = data.get('date')
         
@@ -66,319 +176,83 @@ def get_cause_list():
         if cause_list:
             # Save to file
             filename = scraper.save_cause_list_csv(cause_list)
-            return jsonify({
+            return _json_response({
                 'success': True, 
                 'data': cause_list,
                 'filename': filename
             })
         else:
-            return jsonify({'success': False, 'message': 'No cause list found'})
+            return _json_response({'success': False, 'message': 'No cause list found'})
             
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}, 500)
+
+@app.route('/causelist/html', methods=['POST'])
+def get_cause_list_html():
+    """Get cause list for a court as a ready-to-insert HTML table."""
+    try:
+        data = _json_body()
+        court_code = data.get('court_code', '01')
+        date = data.get('date')
+        
+        cause_list = scraper.get_cause_list(court_code, date)
+        
+        if cause_list:
+            filename = scraper.save_cause_list_csv(cause_list)
+            return _html_response(_render_cause_list(cause_list, filename))
+        else:
+            return _html_response('<div class="result error"><h3>Error</h3><p>No cause list found</p></div>')
+            
+    except Exception as e:
+        return _json_response({'error': str(e)}, 500)
+
+@app.route('/causelist/stream', methods=['POST'])
+def stream_cause_list():
+    """Stream a court's cause list as NDJSON, one case per line."""
+    try:
+        data = _json_body()
+        court_code = data.get('court_code', '01')
+        date = data.get('date')
+        
+        cause_list = scraper.get_cause_list(court_code, date)
+        if not cause_list:
+            return _json_response({'success': False, 'message': 'No cause list found'})
+        
+        # Rows are encoded one at a time as the client reads them, so the
+        # first bytes go out before the whole list is serialized
+        def generate():
+            for row in cause_list:
+                yield to_json(row, orjson.OPT_APPEND_NEWLINE)
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            
+    except Exception as e:
+        return _json_response({'error': str(e)}, 500)
 
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download a file."""
     try:
+        if X_ACCEL_PREFIX:
+            if not os.path.isfile(filename):
+                return _json_response({'error': 'File not found'}, 404)
+            response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+            # nginx parses this header as a URI, so reserved characters in the
+            # name (space, #, ?, %) must be percent-encoded
+            response.headers['X-Accel-Redirect'] = f"{X_ACCEL_PREFIX.rstrip('/')}/{quote(filename)}"
+            response.headers.set('Content-Disposition', 'attachment', filename=filename)
+            return response
         return send_file(filename, as_attachment=True)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}, 500)
 
 @app.route('/courts')
 def get_courts():
     """Get list of available courts."""
     try:
-        courts = scraper.get_court_list()
-        return jsonify({'success': True, 'data': courts})
+        return Response(_cached_courts_body(), mimetype='application/json')
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _json_response({'error': str(e)}, 500)
 
 if __name__ == '__main__':
-    # Create templates directory and HTML file
-    os.makedirs('templates', exist_ok=True)
-    
-    # Create basic HTML template
-    html_content = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>eCourts Scraper</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        h1 {
-            color: #333;
-            text-align: center;
-            margin-bottom: 30px;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            font-weight: bold;
-        }
-        input, select {
-            width: 100%;
-            padding: 10px;
-            border: 1px solid #ddd;
-            border-radius: 5px;
-            font-size: 16px;
-        }
-        button {
-            background-color: #007bff;
-            color: white;
-            padding: 12px 24px;
-            border: none;
-            border-radius: 5px;
-            cursor: pointer;
-            font-size: 16px;
-            margin-right: 10px;
-        }
-        button:hover {
-            background-color: #0056b3;
-        }
-        .result {
-            margin-top: 20px;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 5px;
-            border-left: 4px solid #007bff;
-        }
-        .error {
-            border-left-color: #dc3545;
-            background-color: #f8d7da;
-        }
-        .success {
-            border-left-color: #28a745;
-            background-color: #d4edda;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>eCourts Case Scraper</h1>
-        
-        <div class="form-group">
-            <label>Search Type:</label>
-            <select id="searchType">
-                <option value="cnr">Search by CNR</option>
-                <option value="details">Search by Case Details</option>
-            </select>
-        </div>
-        
-        <div id="cnrForm">
-            <div class="form-group">
-                <label for="cnr">CNR (Case Number Record):</label>
-                <input type="text" id="cnr" placeholder="Enter CNR">
-            </div>
-        </div>
-        
-        <div id="detailsForm" style="display: none;">
-            <div class="form-group">
-                <label for="caseType">Case Type:</label>
-                <input type="text" id="caseType" placeholder="e.g., Civil, Criminal">
-            </div>
-            <div class="form-group">
-                <label for="caseNumber">Case Number:</label>
-                <input type="text" id="caseNumber" placeholder="Enter case number">
-            </div>
-            <div class="form-group">
-                <label for="year">Year:</label>
-                <input type="text" id="year" placeholder="e.g., 2023">
-            </div>
-        </div>
-        
-        <button id="btnSearch" type="button">Search Case</button>
-        <button id="btnCause" type="button">Get Cause List</button>
-        
-        <div id="result"></div>
-    </div>
-
-    <script>
-        // Ensure buttons always wire up, even if attributes are stripped or cached
-        document.addEventListener('DOMContentLoaded', function() {
-            const btnSearch = document.getElementById('btnSearch');
-            const btnCause = document.getElementById('btnCause');
-            if (btnSearch) {
-                btnSearch.addEventListener('click', function(e) { e.preventDefault(); searchCase(); });
-            }
-            if (btnCause) {
-                btnCause.addEventListener('click', function(e) { e.preventDefault(); getCauseList(); });
-            }
-        });
-        document.getElementById('searchType').addEventListener('change', function() {
-            const cnrForm = document.getElementById('cnrForm');
-            const detailsForm = document.getElementById('detailsForm');
-            
-            if (this.value === 'cnr') {
-                cnrForm.style.display = 'block';
-                detailsForm.style.display = 'none';
-            } else {
-                cnrForm.style.display = 'none';
-                detailsForm.style.display = 'block';
-            }
-        });
-
-        async function searchCase() {
-            const searchType = document.getElementById('searchType').value;
-            const resultDiv = document.getElementById('result');
-            resultDiv.innerHTML = '';
-            
-            let data = { search_type: searchType };
-            
-            if (searchType === 'cnr') {
-                data.cnr = document.getElementById('cnr').value?.trim();
-                if (!data.cnr) {
-                    resultDiv.innerHTML = '<div class="result error"><h3>Error</h3><p>Please enter a CNR.</p></div>';
-                    return;
-                }
-            } else {
-                data.case_type = document.getElementById('caseType').value?.trim();
-                data.case_number = document.getElementById('caseNumber').value?.trim();
-                data.year = document.getElementById('year').value?.trim();
-            }
-            
-            try {
-                const response = await fetch('/search', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(data)
-                });
-                
-                if (!response.ok) {
-                    const text = await response.text();
-                    resultDiv.innerHTML = `
-                        <div class="result error">
-                            <h3>Error</h3>
-                            <p>Server error: ${response.status} ${response.statusText}</p>
-                            <pre>${text}</pre>
-                        </div>
-                    `;
-                    return;
-                }
-
-                const result = await response.json();
-                
-                if (result.success) {
-                    resultDiv.innerHTML = `
-                        <div class="result success">
-                            <h3>Case Found!</h3>
-                            <p><strong>Case Number:</strong> ${result.data.case_number || 'N/A'}</p>
-                            <p><strong>Court:</strong> ${result.data.court_name || 'N/A'}</p>
-                            <p><strong>Serial Number:</strong> ${result.data.serial_number || 'N/A'}</p>
-                            <p><strong>Listed Today:</strong> ${result.data.is_listed_today ? 'Yes' : 'No'}</p>
-                            <p><strong>Listed Tomorrow:</strong> ${result.data.is_listed_tomorrow ? 'Yes' : 'No'}</p>
-                        </div>
-                    `;
-                } else {
-                    resultDiv.innerHTML = `
-                        <div class="result error">
-                            <h3>Case Not Found</h3>
-                            <p>${result.message || 'No matching case was found for the given input.'}</p>
-                        </div>
-                    `;
-                }
-            } catch (error) {
-                resultDiv.innerHTML = `
-                    <div class="result error">
-                        <h3>Error</h3>
-                        <p>${error.message}</p>
-                        <pre>${error.stack || ''}</pre>
-                    </div>
-                `;
-            }
-        }
-
-        async function getCauseList() {
-            const resultDiv = document.getElementById('result');
-            
-            try {
-                const response = await fetch('/causelist', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ court_code: '01' })
-                });
-                
-                if (!response.ok) {
-                    const text = await response.text();
-                    resultDiv.innerHTML = `
-                        <div class="result error">
-                            <h3>Error</h3>
-                            <p>Server error: ${response.status} ${response.statusText}</p>
-                            <pre>${text}</pre>
-                        </div>
-                    `;
-                    return;
-                }
-
-                const result = await response.json();
-                
-                if (result.success) {
-                    let html = '<div class="result success"><h3>Cause List Retrieved!</h3>';
-                    html += `<p>Found ${result.data.length} cases</p>`;
-                    html += '<table border="1" style="width: 100%; border-collapse: collapse;">';
-                    html += '<tr><th>Serial</th><th>Case Number</th><th>Time</th><th>Court Room</th></tr>';
-                    
-                    result.data.slice(0, 10).forEach(row => {
-                        html += `<tr>
-                            <td>${row.serial_number}</td>
-                            <td>${row.case_number}</td>
-                            <td>${row.time}</td>
-                            <td>${row.court_room}</td>
-                        </tr>`;
-                    });
-                    
-                    html += '</table>';
-                    if (result.filename) {
-                        html += `<p><a href="/download/${result.filename}" target="_blank">Download CSV</a></p>`;
-                    }
-                    html += '</div>';
-                    
-                    resultDiv.innerHTML = html;
-                } else {
-                    resultDiv.innerHTML = `
-                        <div class="result error">
-                            <h3>Error</h3>
-                            <p>${result.message || 'Could not fetch cause list'}</p>
-                        </div>
-                    `;
-                }
-            } catch (error) {
-                resultDiv.innerHTML = `
-                    <div class="result error">
-                        <h3>Error</h3>
-                        <p>${error.message}</p>
-                        <pre>${error.stack || ''}</pre>
-                    </div>
-                `;
-            }
-        }
-    </script>
-</body>
-</html>
-    '''
-    
-    with open('templates/index.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
     app.run(debug=True, host='0.0.0.0', port=5000)